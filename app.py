@@ -45,5 +45,11 @@ with app.app_context():
     from routes import register_routes
     register_routes(app)
 
+@app.cli.command('rebuild-neighbours')
+def rebuild_neighbours():
+    """Recompute similar-property recommendations for every listing."""
+    from recommendations import refresh_neighbours
+    refresh_neighbours()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,49 @@
+"""Add property_neighbour and property_vector tables
+
+Revision ID: 3b7e9c1f5a20
+Revises: df214b37d452
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e9c1f5a20'
+down_revision = 'df214b37d452'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('property_neighbour',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('distance', sa.Float(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('neighbour_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['neighbour_id'], ['property.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['property_id'], ['property.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('property_id', 'rank')
+    )
+    with op.batch_alter_table('property_neighbour', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_property_neighbour_neighbour_id'), ['neighbour_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_property_neighbour_property_id'), ['property_id'], unique=False)
+
+    op.create_table('property_vector',
+    sa.Column('property_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('vector', sa.LargeBinary(), nullable=False),
+    sa.Column('radius', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('property_id')
+    )
+
+
+def downgrade():
+    op.drop_table('property_vector')
+    with op.batch_alter_table('property_neighbour', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_property_neighbour_property_id'))
+        batch_op.drop_index(batch_op.f('ix_property_neighbour_neighbour_id'))
+
+    op.drop_table('property_neighbour')
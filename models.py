@@ -46,10 +46,41 @@ class Property(db.Model):
 
     # Relationships
     bookings = db.relationship('Booking', backref='property', lazy=True)
+    neighbours = db.relationship('PropertyNeighbour', foreign_keys='PropertyNeighbour.property_id',
+                                 lazy=True, cascade='all, delete-orphan', order_by='PropertyNeighbour.rank')
 
     def __repr__(self):
         return f'<Property {self.title}>'
 
+class PropertyNeighbour(db.Model):
+    """Precomputed "similar properties" entry, maintained by recommendations.py."""
+    __table_args__ = (db.UniqueConstraint('property_id', 'rank'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    rank = db.Column(db.Integer, nullable=False)        # 0 = most similar
+    distance = db.Column(db.Float, nullable=False)
+
+    # Foreign keys
+    property_id = db.Column(db.Integer, db.ForeignKey('property.id', ondelete='CASCADE'), nullable=False, index=True)
+    neighbour_id = db.Column(db.Integer, db.ForeignKey('property.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # Relationships
+    neighbour = db.relationship('Property', foreign_keys=[neighbour_id])
+
+    def __repr__(self):
+        return f'<PropertyNeighbour {self.property_id} -> {self.neighbour_id}>'
+
+class PropertyVector(db.Model):
+    """Feature vector of a property, maintained by recommendations.py."""
+    # Not a foreign key: the vector outlives a deleted property until the next refresh,
+    # which uses it to find the listings that had it as a neighbour.
+    property_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    vector = db.Column(db.LargeBinary, nullable=False)  # float32 bytes
+    radius = db.Column(db.Float)                        # distance to the K-th neighbour, NULL if fewer
+
+    def __repr__(self):
+        return f'<PropertyVector {self.property_id}>'
+
 class Booking(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     booking_date = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,225 @@
+"""Precomputed "similar properties" recommendations.
+
+Every Property is turned into a feature vector (rent, room type, location
+tokens and facilities) and its top-K nearest available listings are stored
+in the property_neighbour table. The details page then only needs a single
+indexed lookup instead of a search.
+
+Tokens are hashed into a fixed number of columns and rent is log-scaled, so a
+vector never depends on the rest of the catalogue. Vectors are stored in
+property_vector together with each listing's neighbour radius, which lets a
+write vectorise only the changed listings and recompute only the rows whose
+radius the old or new vector falls within.
+"""
+import json
+import re
+import zlib
+
+import numpy as np
+from sqlalchemy import insert, update
+
+from extensions import db
+from models import Property, PropertyNeighbour, PropertyVector
+
+TOP_K = 6
+BATCH_SIZE = 512
+HASH_FEATURES = 256
+_IN_CHUNK = 500  # stay below SQLite's bound-parameter limit
+_EPS = 1e-6      # slack for comparing freshly computed distances with stored ones
+
+RENT_WEIGHT = 1.0
+ROOM_TYPE_WEIGHT = 1.0
+LOCATION_WEIGHT = 1.0
+FACILITIES_WEIGHT = 0.5
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _location_tokens(location):
+    # House numbers don't make two listings similar
+    return {t for t in _TOKEN_RE.findall((location or '').lower()) if not t.isdigit()}
+
+
+def _facility_tokens(facilities):
+    try:
+        items = json.loads(facilities) if facilities else []
+    except (TypeError, ValueError):
+        items = []
+    return {str(f).strip().lower() for f in items if str(f).strip()}
+
+
+def _column(kind, token):
+    return 1 + zlib.crc32(f'{kind}:{token}'.encode()) % HASH_FEATURES
+
+
+def build_feature_matrix(properties):
+    """Return a (len(properties), HASH_FEATURES + 1) float32 matrix, one row per property."""
+    matrix = np.zeros((len(properties), HASH_FEATURES + 1), dtype=np.float32)
+    for i, prop in enumerate(properties):
+        matrix[i, 0] = RENT_WEIGHT * np.log1p(max(prop.rent or 0.0, 0.0))
+        matrix[i, _column('room', (prop.room_type or '').lower())] += ROOM_TYPE_WEIGHT
+        # Token groups are L2-normalised so long addresses or facility lists don't dominate
+        for kind, tokens, weight in (('loc', _location_tokens(prop.location), LOCATION_WEIGHT),
+                                     ('fac', _facility_tokens(prop.facilities), FACILITIES_WEIGHT)):
+            for token in tokens:
+                matrix[i, _column(kind, token)] += weight / np.sqrt(len(tokens))
+    return matrix
+
+
+def _squared_distances(queries, candidates, candidates_sq):
+    dist = np.einsum('ij,ij->i', queries, queries)[:, None] + candidates_sq[None, :] - 2.0 * (queries @ candidates.T)
+    np.maximum(dist, 0.0, out=dist)
+    return dist
+
+
+def _min_distances(matrix, probes):
+    """Distance from every row of ``matrix`` to its closest row of ``probes``."""
+    probes_sq = np.einsum('ij,ij->i', probes, probes)
+    return np.concatenate([
+        np.sqrt(_squared_distances(matrix[start:start + BATCH_SIZE], probes, probes_sq).min(axis=1))
+        for start in range(0, len(matrix), BATCH_SIZE)
+    ])
+
+
+def nearest_neighbours(matrix, rows, candidates, k=TOP_K, batch_size=BATCH_SIZE):
+    """Top-k candidates for each of ``rows`` (indices into ``matrix``).
+
+    Returns ``{row: [(candidate_row, distance), ...]}`` sorted by distance; a row
+    is never its own neighbour.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    candidates = np.asarray(candidates, dtype=np.int64)
+    result = {int(row): [] for row in rows}
+    kk = min(k, len(candidates))
+    if kk == 0 or len(rows) == 0:
+        return result
+
+    cand = matrix[candidates]
+    cand_sq = np.einsum('ij,ij->i', cand, cand)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        dist = _squared_distances(matrix[batch], cand, cand_sq)
+        dist[batch[:, None] == candidates[None, :]] = np.inf
+
+        top = np.argpartition(dist, kk - 1, axis=1)[:, :kk]
+        top_dist = np.take_along_axis(dist, top, axis=1)
+        order = np.argsort(top_dist, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_dist = np.sqrt(np.take_along_axis(top_dist, order, axis=1))
+
+        for row, idx, d in zip(batch, top, top_dist):
+            keep = np.isfinite(d)
+            result[int(row)] = list(zip(candidates[idx[keep]].tolist(), d[keep].tolist()))
+    return result
+
+
+def _chunks(values, size=_IN_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _store_vectors(property_ids):
+    """Recompute stored vectors for the given ids, dropping those of deleted listings.
+
+    Returns ``{id: vector}`` for the listings that still exist.
+    """
+    columns = (Property.id, Property.rent, Property.room_type, Property.location, Property.facilities)
+    vectors = {}
+    for chunk in _chunks(property_ids):
+        props = db.session.query(*columns).filter(Property.id.in_(chunk)).all()
+        PropertyVector.query.filter(PropertyVector.property_id.in_(chunk)).delete(synchronize_session=False)
+        if props:
+            matrix = build_feature_matrix(props)
+            db.session.execute(insert(PropertyVector), [
+                {'property_id': prop.id, 'vector': row.tobytes()} for prop, row in zip(props, matrix)
+            ])
+            vectors.update((prop.id, row) for prop, row in zip(props, matrix))
+    return vectors
+
+
+def _affected_ids(changed, old_vectors, ids, matrix, radius, candidates):
+    """Property ids whose stored neighbour list may change after ``changed`` was edited."""
+    index = {pid: i for i, pid in enumerate(ids.tolist())}
+    affected = changed & index.keys()
+    for chunk in _chunks(changed):
+        affected.update(pid for (pid,) in db.session.query(PropertyNeighbour.property_id)
+                        .filter(PropertyNeighbour.neighbour_id.in_(chunk)).distinct())
+
+    # A row can only gain or lose a changed listing if its old position (the row may have
+    # listed it, possibly already removed by ON DELETE CASCADE) or its new position (it may
+    # now displace the current K-th neighbour) lies within the row's neighbour radius.
+    probes = [old_vectors[pid] for pid in changed if pid in old_vectors]
+    probes += [matrix[i] for i in candidates if int(ids[i]) in changed]
+    if probes and len(ids):
+        near = _min_distances(matrix, np.vstack(probes).astype(np.float64)) <= radius + _EPS
+        affected.update(ids[near].tolist())
+    return affected
+
+
+def refresh_neighbours(changed_ids=None, k=TOP_K):
+    """Recompute stored neighbours and commit.
+
+    With ``changed_ids=None`` the whole table is rebuilt. Otherwise only the given
+    added, edited or deleted property ids are re-vectorised, and only the rows
+    they can affect are recomputed.
+    """
+    if changed_ids is None:
+        PropertyNeighbour.query.delete(synchronize_session=False)
+        PropertyVector.query.delete(synchronize_session=False)
+        changed = {pid for (pid,) in db.session.query(Property.id)}
+        old_vectors = {}
+    else:
+        changed = {int(pid) for pid in changed_ids}
+        old_vectors = {}
+        for chunk in _chunks(changed):
+            old_vectors.update((pv.property_id, np.frombuffer(pv.vector, dtype=np.float32))
+                               for pv in PropertyVector.query.filter(PropertyVector.property_id.in_(chunk)))
+        # Listings without a vector yet (e.g. created before the first rebuild) count as changed
+        changed |= {pid for (pid,) in db.session.query(Property.id)
+                    .outerjoin(PropertyVector, PropertyVector.property_id == Property.id)
+                    .filter(PropertyVector.property_id.is_(None))}
+    new_vectors = _store_vectors(changed)
+
+    rows = (db.session.query(Property.id, Property.available, PropertyVector.vector, PropertyVector.radius)
+            .join(PropertyVector, PropertyVector.property_id == Property.id)
+            .order_by(Property.id)
+            .all())
+    ids = np.array([row.id for row in rows], dtype=np.int64)
+    matrix = np.zeros((len(rows), HASH_FEATURES + 1), dtype=np.float64)
+    for i, row in enumerate(rows):
+        matrix[i] = new_vectors[row.id] if row.id in new_vectors else np.frombuffer(row.vector, dtype=np.float32)
+    radius = np.array([np.inf if row.radius is None else row.radius for row in rows], dtype=np.float64)
+    candidates = np.array([i for i, row in enumerate(rows) if row.available], dtype=np.int64)
+
+    if changed_ids is None:
+        affected = set(ids.tolist())
+    else:
+        affected = _affected_ids(changed, old_vectors, ids, matrix, radius, candidates)
+        for chunk in _chunks(affected | changed):
+            PropertyNeighbour.query.filter(PropertyNeighbour.property_id.in_(chunk)).delete(synchronize_session=False)
+
+    index = {pid: i for i, pid in enumerate(ids.tolist())}
+    neighbour_rows, radius_rows = [], []
+    for row, neighbours in nearest_neighbours(matrix, [index[pid] for pid in affected if pid in index], candidates, k).items():
+        neighbour_rows.extend(
+            {'property_id': int(ids[row]), 'neighbour_id': int(ids[n]), 'rank': rank, 'distance': d}
+            for rank, (n, d) in enumerate(neighbours)
+        )
+        radius_rows.append({'property_id': int(ids[row]),
+                            'radius': neighbours[-1][1] if len(neighbours) == k else None})
+    if neighbour_rows:
+        db.session.execute(insert(PropertyNeighbour), neighbour_rows)
+    if radius_rows:
+        db.session.execute(update(PropertyVector), radius_rows)
+    db.session.commit()
+
+
+def similar_properties(property_id, limit=TOP_K):
+    """Stored neighbours of a property, most similar first."""
+    return (Property.query
+            .join(PropertyNeighbour, PropertyNeighbour.neighbour_id == Property.id)
+            .filter(PropertyNeighbour.property_id == property_id, Property.available == True)
+            .order_by(PropertyNeighbour.rank)
+            .limit(limit)
+            .all())
@@ -7,6 +7,7 @@ from werkzeug.utils import secure_filename
 from extensions import db
 from models import User, Property, Booking
 from forms import LoginForm, RegistrationForm, PropertyForm, SearchForm, BookingForm
+from recommendations import refresh_neighbours, similar_properties
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
@@ -15,6 +16,14 @@ def allowed_file(filename):
 
 def register_routes(app):
 
+    def refresh_recommendations(*property_ids):
+        # Listing changes are already committed; a failed refresh only leaves recommendations stale
+        try:
+            refresh_neighbours(property_ids)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f'Recommendations refresh error: {e}')
+
     # ---------------- Home ----------------
     @app.route('/')
     def index():
@@ -139,6 +148,7 @@ def register_routes(app):
             try:
                 db.session.add(new_property)
                 db.session.commit()
+                refresh_recommendations(new_property.id)
                 flash('Property added!', 'success')
                 return redirect(url_for('dashboard'))
             except Exception as e:
@@ -159,7 +169,8 @@ def register_routes(app):
             property=property_obj,
             facilities=facilities,
             images=images,
-            booking_form=booking_form
+            booking_form=booking_form,
+            similar_properties=similar_properties(property_id)
         )
 
     # ---------------- Upload QR ----------------
@@ -232,6 +243,7 @@ def register_routes(app):
             return redirect(url_for('dashboard'))
         db.session.delete(property_obj)
         db.session.commit()
+        refresh_recommendations(property_id)
         flash("Property deleted", "success")
         return redirect(url_for('dashboard'))
 
@@ -286,6 +298,7 @@ def register_routes(app):
 
             try:
                 db.session.commit()
+                refresh_recommendations(property_obj.id)
                 flash("Property updated successfully!", "success")
                 return redirect(url_for("dashboard"))
             except Exception as e:
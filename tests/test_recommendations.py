@@ -0,0 +1,147 @@
+import json
+import random
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from extensions import db
+from models import User, Property, PropertyNeighbour
+from recommendations import TOP_K, build_feature_matrix, refresh_neighbours, similar_properties
+
+LOCATIONS = ['north campus road', 'south park street', 'city centre', 'north park', 'east gate campus']
+FACILITIES = ['wifi', 'laundry', 'parking', 'gym', 'kitchen']
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        # Enforce foreign keys like PostgreSQL does
+        event.listen(db.engine, 'connect', lambda conn, _: conn.execute('PRAGMA foreign_keys=ON'))
+        db.engine.dispose()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def owner(app):
+    user = User(username='owner', email='owner@example.com', role='owner')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_property(owner, rng=random, **fields):
+    values = dict(
+        title='Room',
+        location=rng.choice(LOCATIONS),
+        rent=rng.randint(3000, 20000),
+        room_type=rng.choice(['single', 'shared', 'studio']),
+        facilities=json.dumps(rng.sample(FACILITIES, rng.randint(0, 3))),
+        available=True,
+        owner_id=owner.id,
+    )
+    values.update(fields)
+    prop = Property(**values)
+    db.session.add(prop)
+    db.session.commit()
+    return prop
+
+
+def snapshot():
+    return sorted((n.property_id, n.rank, n.neighbour_id, round(n.distance, 9))
+                  for n in PropertyNeighbour.query.all())
+
+
+def test_incremental_refresh_matches_full_rebuild(owner):
+    rng = random.Random(1)
+    for _ in range(200):
+        props = Property.query.all()
+        op = rng.random()
+        if op < 0.5 or len(props) < 3:
+            pid = add_property(owner, rng, available=rng.random() < 0.8).id
+        elif op < 0.8:
+            prop = rng.choice(props)
+            prop.rent = rng.randint(3000, 20000)
+            prop.location = rng.choice(LOCATIONS)
+            prop.available = rng.random() < 0.8
+            db.session.commit()
+            pid = prop.id
+        else:
+            prop = rng.choice(props)
+            pid = prop.id
+            db.session.delete(prop)
+            db.session.commit()
+
+        refresh_neighbours([pid])
+        incremental = snapshot()
+        refresh_neighbours()
+        assert incremental == snapshot()
+
+
+def test_deleting_a_neighbour_cascades(owner):
+    props = [add_property(owner) for _ in range(5)]
+    refresh_neighbours()
+    victim = props[0].id
+
+    db.session.delete(props[0])
+    db.session.commit()
+
+    assert PropertyNeighbour.query.filter_by(neighbour_id=victim).count() == 0
+    refresh_neighbours([victim])
+    assert all(n.rank < 3 for n in PropertyNeighbour.query.all())
+    assert PropertyNeighbour.query.count() == 4 * 3
+
+
+def test_listing_is_never_its_own_neighbour(owner):
+    for _ in range(TOP_K * 2):
+        add_property(owner)
+    refresh_neighbours()
+
+    assert PropertyNeighbour.query.count() == TOP_K * 2 * TOP_K
+    assert all(n.property_id != n.neighbour_id for n in PropertyNeighbour.query.all())
+
+
+def test_similar_properties_skips_unavailable_neighbours(owner):
+    target = add_property(owner, location='city centre', rent=5000, room_type='single')
+    hidden = add_property(owner, location='city centre', rent=5000, room_type='single')
+    other = add_property(owner, location='north park', rent=15000, room_type='studio')
+    refresh_neighbours()
+    assert similar_properties(target.id) == [hidden, other]
+
+    # Stale rows can still point at a listing that was just hidden
+    hidden.available = False
+    db.session.commit()
+    assert similar_properties(target.id) == [other]
+
+
+def test_house_numbers_are_ignored(owner):
+    a = add_property(owner, location='12 North Park Road', rent=5000, room_type='single', facilities='[]')
+    b = add_property(owner, location='North Park Road 7', rent=5000, room_type='single', facilities='[]')
+    matrix = build_feature_matrix([a, b])
+    assert (matrix[0] == matrix[1]).all()
+
+
+def test_empty_catalogue(app):
+    refresh_neighbours()
+    refresh_neighbours([1])
+    assert PropertyNeighbour.query.count() == 0
+    assert similar_properties(1) == []
+
+
+@pytest.mark.parametrize('count', [1, 2, TOP_K, TOP_K + 1])
+def test_small_catalogues(owner, count):
+    props = [add_property(owner) for _ in range(count)]
+    refresh_neighbours()
+
+    for prop in props:
+        neighbours = similar_properties(prop.id)
+        assert len(neighbours) == min(TOP_K, count - 1)
+        assert prop not in neighbours
+    assert [n.rank for n in props[0].neighbours] == list(range(min(TOP_K, count - 1)))